@@ -0,0 +1,105 @@
+#Load test for the valuation service (server.py)
+#Starts the server with the offline FakeProvider, so no Yahoo requests are made.
+#This measures the HTTP layer, the shared cache and request coalescing only: YahooProvider's
+#rate limiter and thread pool are not used, so real throughput on a cold cache will be lower.
+#Run with: python load_test.py [seconds] [clients] [holdings]
+import asyncio
+import sys
+import time
+
+import server
+
+
+ENDPOINTS = [
+    "/holdings",
+    "/summary",
+    "/rebalance?{first}=60&{second}=40",
+    "/info/{first}",
+    "/history/{second}?period=1y&interval=1wk",
+]
+
+
+def make_portfolio(n):
+    """
+    Builds a made-up portfolio with n holdings
+    :param n: number of holdings
+    :return: portfolio dictionary
+    """
+    return {f"T{i:04d}": {"shares": 10.0 + i, "avg_cost": 50.0, "currency": "USD", "dividends": 0.0} for i in range(n)}
+
+
+async def client(port, paths, deadline, counts):
+    """
+    Sends requests one after another over one keep-alive connection until the deadline
+    :param port: server port
+    :param paths: request paths, used in turn
+    :param deadline: monotonic time at which to stop
+    :param counts: dict with "ok" and "errors" counters (changed in place)
+    :return: None
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    i = 0
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await reader.readexactly(length)
+
+        if status == 200:
+            counts["ok"] += 1
+        else:
+            counts["errors"] += 1
+    writer.close()
+
+
+async def run_load_test(seconds, clients, holdings):
+    """
+    Runs the load test and prints requests/second and cache statistics
+    :param seconds: test duration
+    :param clients: number of concurrent connections
+    :param holdings: number of holdings in the test portfolio
+    :return: None
+    """
+    portfolio = make_portfolio(holdings)
+    tickers = list(portfolio.keys())
+    paths = [p.format(first=tickers[0], second=tickers[-1]) for p in ENDPOINTS]
+
+    service = server.ValuationService(server.FakeProvider(), load_portfolio=lambda: portfolio,
+                                      load_actions=lambda: {"actions": {}})
+    srv = await server.start_server(service, port=0) # 0 = any free port
+    port = srv.sockets[0].getsockname()[1]
+
+    counts = {"ok": 0, "errors": 0}
+    start = time.monotonic()
+    deadline = start + seconds
+    # clients start at different endpoints, so the same data is requested concurrently from different paths
+    await asyncio.gather(*[client(port, paths[i % len(paths):] + paths[:i % len(paths)], deadline, counts)
+                           for i in range(clients)])
+    elapsed = time.monotonic() - start
+
+    srv.close()
+    await srv.wait_closed()
+
+    stats = service.stats()
+    total = counts["ok"] + counts["errors"]
+    print(f"Clients: {clients}, holdings: {holdings}, duration: {elapsed:.1f}s")
+    print(f"Requests: {total} ({counts['errors']} errors)")
+    print(f"Throughput: {total / elapsed:.1f} requests/second")
+    print(f"Provider calls: {stats['provider_calls']}, cache hits: {stats['cache_hits']}, misses: {stats['cache_misses']}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    seconds, clients, holdings = args + [10, 50, 20][len(args):] # defaults for missing arguments
+    asyncio.run(run_load_test(seconds, clients, holdings))
@@ -3,7 +3,9 @@
 import yfinance as yf
 import matplotlib.pyplot as plt
 import json
+import csv
 import os
+from datetime import date, timedelta
 
 
 # ---------------------------
@@ -56,6 +58,12 @@ def delete_data_file():
     else:
         print("No saved data file found.")
 
+    if os.path.exists(ACTIONS_FILE): # cached splits/dividends are only valid for the deleted holdings
+        try:
+            os.remove(ACTIONS_FILE)
+        except Exception:
+            print("Could not delete the corporate actions cache.")
+
 
 # ---------------------------
 # METADATA FETCHER
@@ -101,6 +109,7 @@ def print_menu():
     print("4) View stock info from portfolio")
     print("5) Trendline price chart (multiple timeframes)")
     print("6) Delete saved data")
+    print("7) Export report (CSV/JSON Lines/Parquet)")
     print("0) Exit")
 
 
@@ -138,6 +147,43 @@ def show_basic_ticker_info(ticker):
 # HOLDINGS
 # portfolio = {"AAPL": {"shares": 5.0, "avg_cost": 150.0}, ...}
 # ---------------------------
+def make_holding(shares, avg_cost, currency, as_of, old=None):
+    """
+    Builds a holding from shares and avg_cost as they were on the date as_of.
+    Splits and dividends after as_of are applied later by update_corporate_actions().
+    :param shares: number of shares on as_of
+    :param avg_cost: average cost per share on as_of
+    :param currency: currency of the ticker
+    :param as_of: date (YYYY-MM-DD) the figures refer to
+    :param old: existing holding of the same ticker (or None), whose received dividends are kept
+    :return: holding dictionary
+    :raises ValueError: if a number or the date is invalid
+    """
+    if shares <= 0 or avg_cost <= 0:
+        raise ValueError("Shares and avg_cost must be > 0.")
+    try:
+        date.fromisoformat(as_of)
+    except ValueError:
+        raise ValueError("Invalid date.")
+    if as_of > date.today().isoformat():
+        raise ValueError("Date cannot be in the future.")
+
+    dividends = 0.0
+    if old is not None:
+        since = old.get("actions_through", "")
+        if as_of < since: # events up to that date were already counted in the dividends kept below
+            raise ValueError(f"Date must be on or after {since}, the last split/dividend already processed.")
+        dividends = old.get("dividends", 0.0)
+
+    return {
+        "shares": shares,
+        "avg_cost": avg_cost,
+        "currency": currency,
+        "actions_through": as_of, # splits/dividends after this date are applied later
+        "dividends": dividends,
+    } # creating dict which will be saved
+
+
 def manage_holdings(portfolio):
     """
     Lets the user add, update, remove and view holdings
@@ -163,22 +209,30 @@ def manage_holdings(portfolio):
             if info_meta is None:
                 continue
 
+            # splits/dividends after this date are applied automatically, so shares and cost must not include them yet
+            print("Enter shares and average cost as they were on a given date.")
+            print("Current figures from your broker already include past splits: use today's date for those.")
+            as_of = input("Figures as of date (YYYY-MM-DD, blank = today): ").strip()
+            if as_of == "":
+                as_of = date.today().isoformat()
             try:
-                shares = float(input("Number of shares: ").strip())
-                avg_cost = float(input("Average cost per share: ").strip())
+                date.fromisoformat(as_of)
             except ValueError:
-                print("Invalid number.")
+                print("Invalid date.")
                 continue
 
-            if shares <= 0 or avg_cost <= 0:
-                print("Shares and avg_cost must be > 0.")
+            try:
+                shares = float(input(f"Number of shares on {as_of}: ").strip())
+                avg_cost = float(input(f"Average cost per share on {as_of}: ").strip())
+            except ValueError:
+                print("Invalid number.")
                 continue
 
-            portfolio[ticker] = {
-                "shares": shares,
-                "avg_cost": avg_cost,
-                "currency": info_meta["currency"],
-            } # creating dict which will be saved
+            try:
+                portfolio[ticker] = make_holding(shares, avg_cost, info_meta["currency"], as_of, portfolio.get(ticker))
+            except ValueError as e:
+                print(e)
+                continue
             save_data(portfolio) # saving file
             print("Saved:", ticker)
 
@@ -198,7 +252,8 @@ def manage_holdings(portfolio):
                 for t in portfolio:
                     info = portfolio[t]
                     cur = info.get("currency", "N/A")
-                    print(f"{t}: {info['shares']} shares @ avg cost {info['avg_cost']} ({cur})")
+                    print(f"{t}: {info['shares']} shares @ avg cost {info['avg_cost']} ({cur})"
+                          f", dividends received {info.get('dividends', 0.0):.2f}")
 
         elif choice == "0": # back option
             break
@@ -254,6 +309,217 @@ def manual_fix_prices(prices):
     return fixed
 
 
+# ---------------------------
+# CORPORATE ACTIONS (SPLITS & DIVIDENDS)
+# new splits/dividends are downloaded at most once per day and cached in ACTIONS_FILE,
+# together with the date each ticker was last fetched (the next download starts there)
+# and the earliest date its cached history covers (a holding needing older events is fetched again)
+# each holding keeps "actions_through" (last event date already applied) and "dividends" (cash received),
+# so later runs only apply events that happened after that date
+# ---------------------------
+ACTIONS_FILE = "corporate_actions.json"
+
+
+def load_actions_cache():
+    """
+    Loads the cached split/dividend history from a JSON file (if it exists).
+    :return: cache dictionary {"fetched": {ticker: date}, "covers_from": {ticker: date},
+             "actions": {ticker: {"splits": [...], "dividends": [...]}}}
+    """
+    if not os.path.exists(ACTIONS_FILE):
+        return {"fetched": {}, "covers_from": {}, "actions": {}}
+
+    try:
+        with open(ACTIONS_FILE, "r") as f:
+            cache = json.load(f)
+            cache.setdefault("fetched", {})
+            cache.setdefault("covers_from", {}) # missing in older caches, so their history is fetched again once
+            cache.setdefault("actions", {})
+            return cache
+    except Exception:
+        print("Warning: Could not load corporate actions cache. It will be rebuilt.")
+        return {"fetched": {}, "covers_from": {}, "actions": {}}
+
+
+def save_actions_cache(cache):
+    """
+    Saves the split/dividend history cache to a JSON file.
+    :param cache: cache dictionary
+    :return: None
+    """
+    try:
+        with open(ACTIONS_FILE, "w") as f:
+            json.dump(cache, f, indent=4)
+    except Exception:
+        print("Warning: Could not save corporate actions cache.")
+
+
+def unadjust_dividends(splits, dividends):
+    """
+    Yahoo reports past dividends adjusted for later splits, so this converts them back to
+    the amount per share that was actually paid on that date.
+    :param splits: list of [date, ratio] from the same download as the dividends
+    :param dividends: list of [date, amount] (changed in place)
+    :return: the same dividends list
+    """
+    for d in dividends:
+        for day, ratio in splits:
+            if day > d[0]: # multiply by every split that happened after the dividend
+                d[1] = d[1] * ratio
+    return dividends
+
+
+def fetch_corporate_actions(tickers, start):
+    """
+    Fetches the splits and dividends of all given tickers since `start` in one yf.download call.
+    :param tickers: list of ticker symbols
+    :param start: first date to fetch (YYYY-MM-DD)
+    :return: dictionary mapping each ticker to {"splits": [[date, ratio]], "dividends": [[date, amount]]} (or None)
+    """
+    result = {t: None for t in tickers}
+    if len(tickers) == 0:
+        return result
+
+    try:
+        data = yf.download(tickers, start=start, actions=True, group_by="ticker", progress=False)
+    except Exception:
+        return result
+
+    for t in tickers:
+        # a failed download still returns a DataFrame, just without any rows for that ticker
+        if data is None or data.empty or t not in data.columns.get_level_values(0):
+            continue
+        frame = data[t]
+        if "Close" not in frame.columns or frame["Close"].dropna().empty:
+            continue
+
+        splits = []
+        dividends = []
+        for ts, row in frame.iterrows():
+            day = ts.strftime("%Y-%m-%d")
+            ratio = row.get("Stock Splits", 0)
+            amount = row.get("Dividends", 0)
+            if ratio > 0: # NaN > 0 is False, so days without events are skipped
+                splits.append([day, float(ratio)])
+            if amount > 0:
+                dividends.append([day, float(amount)])
+
+        result[t] = {"splits": splits, "dividends": unadjust_dividends(splits, dividends)}
+    return result
+
+
+def merge_corporate_actions(old, new, start):
+    """
+    Replaces the cached events from `start` on with a newer download of the same period
+    :param old: cached {"splits": [...], "dividends": [...]} for a ticker (or None)
+    :param new: downloaded {"splits": [...], "dividends": [...]} since start
+    :param start: first date covered by the new download (YYYY-MM-DD)
+    :return: merged dictionary
+    """
+    if old is None:
+        old = {"splits": [], "dividends": []}
+    merged = {}
+    for kind in ["splits", "dividends"]:
+        merged[kind] = [e for e in old[kind] if e[0] < start] + new[kind]
+    return merged
+
+
+def apply_corporate_actions(holding, actions):
+    """
+    Applies splits and dividends newer than the holding's "actions_through" date, in date order.
+    Splits change shares and avg_cost (total cost stays the same), dividends are added as cash income.
+    :param holding: dictionary of one position (changed in place)
+    :param actions: {"splits": [[date, ratio]], "dividends": [[date, amount]]} for that ticker
+    :return: number of events applied
+    """
+    since = holding.get("actions_through", "")
+
+    events = []
+    for day, amount in actions["dividends"]:
+        if day > since:
+            events.append((day, 0, amount)) # 0 sorts dividends before a split on the same day
+    for day, ratio in actions["splits"]:
+        if day > since:
+            events.append((day, 1, ratio))
+    events.sort()
+
+    for day, kind, value in events:
+        if kind == 0:
+            holding["dividends"] = holding.get("dividends", 0.0) + holding["shares"] * value
+        else:
+            holding["shares"] = holding["shares"] * value
+            holding["avg_cost"] = holding["avg_cost"] / value
+        holding["actions_through"] = day
+
+    return len(events)
+
+
+def update_corporate_actions(portfolio):
+    """
+    Brings every holding up to date with its splits and dividends, downloading new events at most once per day
+    :param portfolio: dictionary of holdings (changed in place and saved if anything was applied)
+    :return: None
+    """
+    if len(portfolio) == 0:
+        return
+
+    today = date.today().isoformat()
+    cache = load_actions_cache()
+
+    changed = False
+    for t in portfolio:
+        if "actions_through" not in portfolio[t]: # older holdings have no purchase date, so history before today is skipped
+            portfolio[t]["actions_through"] = today
+            portfolio[t].setdefault("dividends", 0.0)
+            changed = True
+
+    # forgetting tickers that were removed from the portfolio
+    for key in ["fetched", "covers_from", "actions"]:
+        for t in list(cache[key].keys()):
+            if t not in portfolio:
+                del cache[key][t]
+
+    # first date each ticker still needs: the last fetch if the cached history goes back far enough,
+    # otherwise the holding's own date (e.g. a ticker re-added with an earlier purchase date)
+    needed = {}
+    covered = {}
+    for t in portfolio:
+        covers_from = cache["covers_from"].get(t)
+        covered[t] = t in cache["fetched"] and covers_from is not None and covers_from <= portfolio[t]["actions_through"]
+        if not covered[t]:
+            needed[t] = portfolio[t]["actions_through"]
+        elif cache["fetched"][t] != today:
+            needed[t] = cache["fetched"][t]
+
+    stale = list(needed.keys())
+    if len(stale) > 0:
+        # one download for all stale tickers, starting at the oldest date any of them still needs
+        # (a week earlier, so that even after a weekend or holiday a valid ticker returns some rows)
+        start = (date.fromisoformat(min(needed.values())) - timedelta(days=7)).isoformat()
+
+        fetched = fetch_corporate_actions(stale, start)
+        for t in stale:
+            if fetched[t] is None: # not marked as fetched, so it is tried again next time
+                print(f"Warning: Could not fetch splits/dividends for {t}.")
+                continue
+            cache["actions"][t] = merge_corporate_actions(cache["actions"].get(t), fetched[t], start)
+            cache["fetched"][t] = today
+            if covered[t]:
+                cache["covers_from"][t] = min(cache["covers_from"][t], start)
+            else:
+                cache["covers_from"][t] = start
+    save_actions_cache(cache)
+
+    applied = 0
+    for t in portfolio:
+        if t in cache["actions"]:
+            applied += apply_corporate_actions(portfolio[t], cache["actions"][t])
+
+    if applied > 0:
+        print(f"Applied {applied} new split/dividend event(s).")
+    if changed or applied > 0:
+        save_data(portfolio)
+
 # ---------------------------
 # STOCK INFO
 # ---------------------------
@@ -390,6 +656,19 @@ def view_stock_info_from_holdings(portfolio):
         print("Could not fetch company info right now.")
 
 
+# menu number -> (menu label, yahoo period, yahoo interval, chart title)
+TIMEFRAMES = {
+    "1": ("1w", "5d", "1h", "1 Week"),
+    "2": ("1m", "1mo", "1d", "1 Month"),
+    "3": ("ytd", "ytd", "1d", "YTD"),
+    "4": ("1y", "1y", "1wk", "1 Year"),
+    "5": ("2y", "2y", "1wk", "2 Years"),
+    "6": ("5y", "5y", "1wk", "5 Years"),
+    "7": ("10y", "10y", "1mo", "10 Years"),
+    "8": ("all", "max", "1mo", "All Time"),
+}
+
+
 def plot_price_trend_from_holdings(portfolio): # using matplotlib
     """
     Plots a simple trendline chart of a selected holding's price.
@@ -424,56 +703,19 @@ def plot_price_trend_from_holdings(portfolio): # using matplotlib
     ticker = tickers[i_stock] # getting ticker from list of portfolio dict using stock index
 
     print("\nChoose a timeframe:")
-    print("1) 1w")
-    print("2) 1m")
-    print("3) ytd")
-    print("4) 1y")
-    print("5) 2y")
-    print("6) 5y")
-    print("7) 10y")
-    print("8) all")
+    for key in TIMEFRAMES:
+        print(f"{key}) {TIMEFRAMES[key][0]}")
     tf = input("Choose timeframe number: ").strip()
 
     # timeframe mapping
-    if tf == "1":
-        period = "5d"
-        interval = "1h"
-        title_tf = "1 Week"
-    elif tf == "2":
-        period = "1mo"
-        interval = "1d"
-        title_tf = "1 Month"
-    elif tf == "3":
-        period = "ytd"
-        interval = "1d"
-        title_tf = "YTD"
-    elif tf == "4":
-        period = "1y"
-        interval = "1wk"
-        title_tf = "1 Year"
-    elif tf == "5":
-        period = "2y"
-        interval = "1wk"
-        title_tf = "2 Years"
-    elif tf == "6":
-        period = "5y"
-        interval = "1wk"
-        title_tf = "5 Years"
-    elif tf == "7":
-        period = "10y"
-        interval = "1mo"
-        title_tf = "10 Years"
-    elif tf == "8":
-        period = "max"
-        interval = "1mo"
-        title_tf = "All Time"
-    else:
+    if tf not in TIMEFRAMES:
         print("Invalid option.")
         return
+    _, period, interval, title_tf = TIMEFRAMES[tf] # the menu label is only needed for printing the menu
 
     try:
         tk = yf.Ticker(ticker)
-        hist = tk.history(period=period, interval=interval) # changes depending on if statement above
+        hist = tk.history(period=period, interval=interval) # depends on the chosen timeframe (see TIMEFRAMES)
 
         if hist.empty:
             print("No price data found for this timeframe.")
@@ -497,10 +739,109 @@ def plot_price_trend_from_holdings(portfolio): # using matplotlib
 
 # ---------------------------
 # SUMMARY
+# rows are produced one at a time by generators, so printing and exporting never build a full list
 # ---------------------------
+def position_rows(portfolio, prices, total_value=0.0):
+    """
+    Yields the valuation of each holding, one position at a time
+    :param portfolio: dictionary of holdings
+    :param prices: dictionary mapping each ticker to its price (no None values)
+    :param total_value: total portfolio value, used for the weight (0 if not known yet)
+    :return: generator of dicts, one per position
+    """
+    for t in portfolio:
+        shares = portfolio[t]["shares"] # no need to use .get(), as we're sure that the ticker exists
+        avg_cost = portfolio[t]["avg_cost"]
+        price = prices[t]
+        currency = portfolio[t].get("currency", "N/A")
+        dividends = portfolio[t].get("dividends", 0.0) # cash received so far, kept up to date by update_corporate_actions()
+
+        value = shares * price # total stock value
+        cost = shares * avg_cost # total stock cost
+        unreal = (price - avg_cost) * shares # total stock P/L
+        total_ret = unreal + dividends # price P/L plus cash income
+
+        # unrealized % and total return % for each position
+        if avg_cost > 0:
+            unreal_pct = ((price - avg_cost) / avg_cost) * 100
+            total_ret_pct = (total_ret / cost) * 100
+        else:
+            unreal_pct = 0.0
+            total_ret_pct = 0.0
+
+        if total_value > 0:
+            weight = (value / total_value) * 100
+        else:
+            weight = 0.0 # since if total_value = 0, the program crashes
+
+        yield {
+            "ticker": t,
+            "currency": currency,
+            "shares": shares,
+            "avg_cost": avg_cost,
+            "price": price,
+            "value": value,
+            "cost": cost,
+            "unreal": unreal,
+            "unreal_pct": unreal_pct,
+            "dividends": dividends,
+            "total_return": total_ret,
+            "total_return_pct": total_ret_pct,
+            "weight": weight,
+        }
+
+
+def portfolio_totals(portfolio, prices):
+    """
+    Adds up value, cost, unrealized P/L and dividends over all positions
+    :param portfolio: dictionary of holdings
+    :param prices: dictionary mapping each ticker to its price (no None values)
+    :return: dict with the portfolio totals ("currency" is "MIXED" if holdings use more than one currency)
+    """
+    total_value = 0.0
+    total_cost = 0.0
+    total_unreal = 0.0
+    total_dividends = 0.0
+    currencies = set()
+
+    for row in position_rows(portfolio, prices):
+        total_value += row["value"]
+        total_cost += row["cost"]
+        total_unreal += row["unreal"]
+        total_dividends += row["dividends"]
+        currencies.add(row["currency"])
+
+    if len(currencies) == 1:
+        currency = currencies.pop()
+    elif len(currencies) > 1:
+        currency = "MIXED" # totals add up different currencies without FX conversion
+    else:
+        currency = "N/A"
+
+    # total unrealized % and total return % (based on total cost)
+    total_return = total_unreal + total_dividends
+    if total_cost > 0:
+        total_unreal_pct = (total_unreal / total_cost) * 100
+        total_return_pct = (total_return / total_cost) * 100
+    else:
+        total_unreal_pct = 0.0
+        total_return_pct = 0.0
+
+    return {
+        "currency": currency,
+        "value": total_value,
+        "cost": total_cost,
+        "unreal": total_unreal,
+        "unreal_pct": total_unreal_pct,
+        "dividends": total_dividends,
+        "total_return": total_return,
+        "total_return_pct": total_return_pct,
+    }
+
+
 def portfolio_summary(portfolio):
     """
-    Computes and prints the portfolio valuation and unrealized P/L
+    Computes and prints the portfolio valuation, unrealized P/L, dividends and total return
     :param portfolio: dictionary of holdings
     :return: None
     """
@@ -525,66 +866,36 @@ def portfolio_summary(portfolio):
         print("\n⚠️ Warning: Portfolio contains multiple currencies:", ", ".join(sorted(currencies))) # sorts currencies into alphabetical order and joins each element into one string
         print("Totals may not be directly comparable without FX conversion.\n")
 
+    update_corporate_actions(portfolio) # splits change shares/avg_cost, dividends are added as cash income
+
     prices = fetch_prices(tickers)
     prices = manual_fix_prices(prices) # just in case yahoo finance cannot get stock price
 
-    total_value = 0.0
-    total_cost = 0.0
-    total_unreal = 0.0
-    rows = []
-
-    for t in tickers:
-        shares = portfolio[t]["shares"] # no need to use .get(), as we're sure that the ticker exists
-        avg_cost = portfolio[t]["avg_cost"]
-        price = prices[t]
-        currency = portfolio[t].get("currency", "N/A")
-
-        value = shares * price # total stock value
-        cost = shares * avg_cost # total stock cost
-        unreal = (price - avg_cost) * shares # total stock P/L
-
-        # unrealized % for each position
-        if avg_cost > 0:
-            unreal_pct = ((price - avg_cost) / avg_cost) * 100
-        else:
-            unreal_pct = 0.0
-
-        total_value += value
-        total_cost += cost
-        total_unreal += unreal
-
-        rows.append([t, currency, shares, avg_cost, price, value, unreal, unreal_pct])
-
-    # total unrealized % (based on total cost)
-    if total_cost > 0:
-        total_unreal_pct = (total_unreal / total_cost) * 100
-    else:
-        total_unreal_pct = 0.0
+    totals = portfolio_totals(portfolio, prices)
+    total_value = totals["value"]
 
     print("\n===== PORTFOLIO SUMMARY =====")
     print(f"Total value: {total_value:.2f}")
-    print(f"Total cost: {total_cost:.2f}")
-    print(f"Total unrealized P/L: {total_unreal:.2f} ({total_unreal_pct:.2f}%)\n")
+    print(f"Total cost: {totals['cost']:.2f}")
+    print(f"Total unrealized P/L: {totals['unreal']:.2f} ({totals['unreal_pct']:.2f}%)")
+    print(f"Total dividends received: {totals['dividends']:.2f}")
+    print(f"Total return: {totals['total_return']:.2f} ({totals['total_return_pct']:.2f}%)\n")
 
     print(f"{'Ticker':<10} {'Curr':<6} {'Shares':>10} {'AvgCost':>10} {'Price':>10} {'Value':>12}"
-          f" {'Unreal P/L':>12} {'Unreal P/L (%)':>14} {'Weight':>8}")
-    print("-" * 120)
+          f" {'Unreal P/L':>12} {'Unreal P/L (%)':>14} {'Dividends':>10} {'Total ret (%)':>13} {'Weight':>8}")
+    print("-" * 145)
 
     best_t = None
     best_pl = None
     worst_t = None
     worst_pl = None
 
-    for r in rows:
-        t, currency, shares, avg_cost, price, value, unreal, unreal_pct = r  # assigning name to each value
-
-        if total_value > 0:
-            weight = (value / total_value) * 100
-        else:
-            weight = 0 # since if total_value = 0, the program crashes
+    for r in position_rows(portfolio, prices, total_value):
+        t = r["ticker"]
+        unreal = r["unreal"]
 
-        print(f"{t:<10} {currency:<6} {shares:>10.2f} {avg_cost:>10.2f} {price:>10.2f} {value:>12.2f}"
-              f" {unreal:>12.2f} {unreal_pct:>13.2f}% {weight:>7.2f}%")
+        print(f"{t:<10} {r['currency']:<6} {r['shares']:>10.2f} {r['avg_cost']:>10.2f} {r['price']:>10.2f} {r['value']:>12.2f}"
+              f" {unreal:>12.2f} {r['unreal_pct']:>13.2f}% {r['dividends']:>10.2f} {r['total_return_pct']:>12.2f}% {r['weight']:>7.2f}%")
 
         if best_pl is None or unreal > best_pl: # iterating through each ticker and updating best performance
             best_pl = unreal
@@ -602,32 +913,12 @@ def portfolio_summary(portfolio):
 # ---------------------------
 # REBALANCE
 # ---------------------------
-def rebalance_suggestions(portfolio):
+def ask_target_weights(tickers):
     """
-    Suggests buy/sell amounts to reach target portfolio weights
-    :param portfolio: dictionary of holdings
-    :return: None
+    Asks the user for a target weight (in %) for each ticker and normalizes them to sum to 100
+    :param tickers: list of ticker symbols
+    :return: dictionary mapping each ticker to its target weight, or None if all weights are 0
     """
-    if len(portfolio) == 0:
-        print("Portfolio is empty.")
-        return
-
-    tickers = list(portfolio.keys())
-
-    # tickers = []
-    # for t in portfolio:
-    #     tickers.append(t)
-
-    prices = fetch_prices(tickers)
-    prices = manual_fix_prices(prices)
-
-    total_value = 0.0
-    values = {}
-    for t in tickers:
-        v = portfolio[t]["shares"] * prices[t] # total current value of one stock
-        values[t] = v
-        total_value += v
-
     print("\nEnter target weights in % for each ticker.")
     print("Example: if you want 50%, type 50")
 
@@ -649,41 +940,258 @@ def rebalance_suggestions(portfolio):
 
     if total_w == 0: # error handling, because total weight (denominator) cannot be zero
         print("All weights are 0. Nothing to do.")
-        return
+        return None
 
     # normalize to sum to 100
     for t in targets:
         targets[t] = (targets[t] / total_w) * 100
+    return targets
 
-    print("\n===== REBALANCE SUGGESTIONS =====")
-    print(f"Total portfolio value: {total_value:.2f}")
-    print("Targets normalized to sum to 100%.\n")
 
-    for t in tickers:
-        current_val = values[t] # how much this stock is worth now (total)
+def rebalance_trades(portfolio, prices, targets, total_value):
+    """
+    Yields the buy/sell needed for each ticker to reach its target weight, one ticker at a time
+    :param portfolio: dictionary of holdings
+    :param prices: dictionary mapping each ticker to its price (no None values)
+    :param targets: dictionary of target weights in % (summing to 100)
+    :param total_value: total portfolio value
+    :return: generator of dicts with ticker, currency, action ("BUY"/"SELL"/"HOLD"), amount and shares
+    """
+    for t in targets:
+        current_val = portfolio[t]["shares"] * prices[t] # how much this stock is worth now (total)
         target_val = (targets[t] / 100) * total_value # how much this stock should be worth (total) in the portfolio
         gap = target_val - current_val # how much should be bought/sold in total to reach target_val
 
         price = prices[t]
-        currency = portfolio[t].get("currency", "")
-
         if gap > 0: # then BUY more to reach desired weight
-            if price > 0:
-                shares_to_buy = gap / price
-            else:
-                shares_to_buy = 0 # in case share price fell to 0
-            print(f"{t}: BUY about {gap:.2f} {currency} (about {shares_to_buy:.2f} shares)")
+            action = "BUY"
         elif gap < 0: # then SELL more
-            sell_amount = abs(gap)
-            if price > 0:
-                shares_to_sell = sell_amount / price
-            else:
-                shares_to_sell = 0
-            print(f"{t}: SELL about {sell_amount:.2f} {currency} (about {shares_to_sell:.2f} shares)")
+            action = "SELL"
+        else:
+            action = "HOLD"
+
+        amount = abs(gap)
+        if price > 0:
+            trade_shares = amount / price
+        else:
+            trade_shares = 0 # in case share price fell to 0
+
+        yield {
+            "ticker": t,
+            "currency": portfolio[t].get("currency", ""),
+            "target_weight": targets[t],
+            "action": action,
+            "amount": amount,
+            "trade_shares": trade_shares,
+        }
+
+
+def rebalance_suggestions(portfolio):
+    """
+    Suggests buy/sell amounts to reach target portfolio weights
+    :param portfolio: dictionary of holdings
+    :return: None
+    """
+    if len(portfolio) == 0:
+        print("Portfolio is empty.")
+        return
+
+    tickers = list(portfolio.keys())
+
+    # tickers = []
+    # for t in portfolio:
+    #     tickers.append(t)
+
+    update_corporate_actions(portfolio) # a split changes the number of shares held
+
+    prices = fetch_prices(tickers)
+    prices = manual_fix_prices(prices)
+
+    total_value = 0.0
+    for t in tickers:
+        total_value += portfolio[t]["shares"] * prices[t] # total current value of one stock
+
+    targets = ask_target_weights(tickers)
+    if targets is None:
+        return
+
+    print("\n===== REBALANCE SUGGESTIONS =====")
+    print(f"Total portfolio value: {total_value:.2f}")
+    print("Targets normalized to sum to 100%.\n")
+
+    for trade in rebalance_trades(portfolio, prices, targets, total_value):
+        t = trade["ticker"]
+        currency = trade["currency"]
+        if trade["action"] == "BUY":
+            print(f"{t}: BUY about {trade['amount']:.2f} {currency} (about {trade['trade_shares']:.2f} shares)")
+        elif trade["action"] == "SELL":
+            print(f"{t}: SELL about {trade['amount']:.2f} {currency} (about {trade['trade_shares']:.2f} shares)")
         else:
             print(f"{t}: already on target")
 
 
+# ---------------------------
+# EXPORT
+# summary rows, totals and rebalance trades are streamed straight into the file,
+# so memory use does not grow with the number of holdings
+# ---------------------------
+EXPORT_FIELDS = [
+    "record", "ticker", "currency", "shares", "avg_cost", "price", "value", "cost",
+    "unreal", "unreal_pct", "dividends", "total_return", "total_return_pct", "weight",
+    "target_weight", "action", "amount", "trade_shares",
+]
+EXPORT_CHUNK_SIZE = 10000 # rows per Parquet row group
+
+
+def report_rows(portfolio, prices, targets=None):
+    """
+    Yields every report record: one per position, then the totals, then (optionally) one per rebalance trade.
+    Every record has all EXPORT_FIELDS keys (None where a field does not apply).
+    :param portfolio: dictionary of holdings
+    :param prices: dictionary mapping each ticker to its price (no None values)
+    :param targets: dictionary of normalized target weights in %, or None to skip rebalance trades
+    :return: generator of dicts
+    """
+    totals = portfolio_totals(portfolio, prices)
+
+    for row in position_rows(portfolio, prices, totals["value"]):
+        record = dict.fromkeys(EXPORT_FIELDS)
+        record.update(row)
+        record["record"] = "position"
+        yield record
+
+    record = dict.fromkeys(EXPORT_FIELDS)
+    record.update(totals)
+    record["record"] = "total"
+    record["weight"] = 100.0 if totals["value"] > 0 else 0.0
+    yield record
+
+    if targets is not None:
+        for trade in rebalance_trades(portfolio, prices, targets, totals["value"]):
+            record = dict.fromkeys(EXPORT_FIELDS)
+            record.update(trade)
+            record["record"] = "trade"
+            yield record
+
+
+def write_csv(rows, path):
+    """
+    Writes report records to a CSV file, one row at a time
+    :param rows: iterable of dicts with EXPORT_FIELDS keys
+    :param path: output file name
+    :return: number of rows written
+    """
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_jsonl(rows, path):
+    """
+    Writes report records to a JSON Lines file (one JSON object per line)
+    :param rows: iterable of dicts with EXPORT_FIELDS keys
+    :param path: output file name
+    :return: number of rows written
+    """
+    count = 0
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def write_parquet(rows, path, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Writes report records to a Parquet file in chunks of chunk_size rows (needs pyarrow)
+    :param rows: iterable of dicts with EXPORT_FIELDS keys
+    :param path: output file name
+    :param chunk_size: number of rows kept in memory before they are written as one row group
+    :return: number of rows written
+    """
+    import pyarrow as pa # optional dependency, only needed for this format
+    import pyarrow.parquet as pq
+
+    text_fields = ["record", "ticker", "currency", "action"]
+    schema = pa.schema([(name, pa.string() if name in text_fields else pa.float64()) for name in EXPORT_FIELDS])
+
+    count = 0
+    chunk = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                count += len(chunk)
+                chunk = []
+        if len(chunk) > 0: # last, smaller chunk
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+EXPORT_WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+}
+
+
+def export_report(portfolio):
+    """
+    Exports the portfolio summary (and optionally rebalance trades) to CSV, JSON Lines or Parquet
+    :param portfolio: dictionary of holdings
+    :return: None
+    """
+    if len(portfolio) == 0:
+        print("\nPortfolio is empty. Add holdings first.")
+        return
+
+    print("\nChoose a format:")
+    print("1) CSV")
+    print("2) JSON Lines")
+    print("3) Parquet")
+    fmt_choice = input("Choose format number: ").strip()
+
+    if fmt_choice == "1":
+        fmt = "csv"
+    elif fmt_choice == "2":
+        fmt = "jsonl"
+    elif fmt_choice == "3":
+        fmt = "parquet"
+    else:
+        print("Invalid option.")
+        return
+
+    path = input(f"Output file (blank = portfolio_report.{fmt}): ").strip()
+    if path == "":
+        path = f"portfolio_report.{fmt}"
+
+    tickers = list(portfolio.keys())
+
+    update_corporate_actions(portfolio)
+
+    prices = fetch_prices(tickers)
+    prices = manual_fix_prices(prices)
+
+    targets = None
+    if input("Include rebalance trades? (y/n): ").strip().lower() == "y":
+        targets = ask_target_weights(tickers)
+
+    try:
+        count = EXPORT_WRITERS[fmt](report_rows(portfolio, prices, targets), path)
+        print(f"Exported {count} rows to {path}.")
+    except ImportError:
+        print("Parquet export needs pyarrow (pip install pyarrow).")
+    except Exception:
+        print("Could not write the export file.")
+
+
 # ---------------------------
 # MAIN
 # ---------------------------
@@ -712,6 +1220,8 @@ def main():
         elif choice == "6":
             delete_data_file()
             portfolio = {} # resetting memory, as without this line, the portfolio would remain in the memory
+        elif choice == "7":
+            export_report(portfolio)
         elif choice == "0":
             print("Goodbye!")
             break
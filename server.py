@@ -0,0 +1,567 @@
+#Local HTTP/JSON valuation service
+#Run with: python server.py [port]
+import asyncio
+import copy
+import json
+import math
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import yfinance as yf
+
+import main
+
+
+# ---------------------------
+# PROVIDERS
+# every desk talks to one provider object, so Yahoo only sees one small, rate-limited pool of connections
+# ---------------------------
+class YahooProvider:
+    """
+    Fetches quotes, metadata and price history from Yahoo Finance.
+    The blocking yfinance calls run on a small shared thread pool, and calls are spaced out
+    so that no more than max_per_second requests are sent.
+    """
+
+    def __init__(self, max_connections=4, max_per_second=5.0):
+        """
+        :param max_connections: number of yfinance calls allowed to run at the same time
+        :param max_per_second: maximum number of yfinance calls started per second
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_connections)
+        self.min_interval = 1.0 / max_per_second
+        self.next_slot = 0.0 # monotonic time at which the next call may start
+        self.slot_lock = None # created inside the running event loop
+        self.calls = 0
+
+    async def _run(self, func, *args):
+        """
+        Waits for a free rate-limit slot, then runs a blocking function on the shared pool
+        :param func: blocking function to run
+        :return: whatever func returns
+        """
+        if self.slot_lock is None:
+            self.slot_lock = asyncio.Lock()
+        async with self.slot_lock: # reserving the next slot, one caller at a time
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.min_interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def quotes(self, tickers):
+        """
+        Fetches the latest prices of several tickers.
+        main.fetch_prices sends one yahoo request per ticker (and so does yf.download internally),
+        so each ticker takes its own rate-limit slot.
+        :param tickers: list of stock symbols
+        :return: dictionary mapping each ticker to its latest price (or None)
+        """
+        results = await asyncio.gather(*[self._run(main.fetch_prices, [t]) for t in tickers]) # same lookup as the CLI
+        prices = {}
+        for result in results:
+            prices.update(result)
+        return prices
+
+    async def metadata(self, ticker):
+        """
+        :param ticker: stock symbol
+        :return: yahoo's info dict, or None if it could not be fetched
+        """
+        def fetch():
+            try:
+                return yf.Ticker(ticker).info
+            except Exception:
+                return None
+        return await self._run(fetch)
+
+    async def history(self, ticker, period, interval):
+        """
+        :param ticker: stock symbol
+        :param period: yahoo period, e.g. "1mo"
+        :param interval: yahoo interval, e.g. "1d"
+        :return: list of [date, close] pairs, or None if no data was found
+        """
+        def fetch():
+            try:
+                hist = yf.Ticker(ticker).history(period=period, interval=interval)
+            except Exception:
+                return None
+            if hist.empty:
+                return None
+            return [[ts.isoformat(), float(close)] for ts, close in hist["Close"].items()]
+        return await self._run(fetch)
+
+
+class FakeProvider:
+    """
+    Offline provider with made-up, deterministic data, used by load_test.py.
+    Each call sleeps for `latency` seconds to imitate a network round trip.
+    """
+
+    def __init__(self, latency=0.05):
+        """
+        :param latency: seconds each call takes
+        """
+        self.latency = latency
+        self.calls = 0
+
+    def _price(self, ticker):
+        return 10.0 + sum(ord(c) for c in ticker) % 490 # same ticker, same price
+
+    async def quotes(self, tickers):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return {t: self._price(t) for t in tickers}
+
+    async def metadata(self, ticker):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return {"longName": f"{ticker} Inc.", "exchange": "FAKE", "currency": "USD", "sector": "Testing"}
+
+    async def history(self, ticker, period, interval):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        price = self._price(ticker)
+        return [[f"2026-01-{day:02d}", price * (1 + 0.01 * math.sin(day))] for day in range(1, 29)]
+
+
+# ---------------------------
+# SHARED CACHE
+# one cache for all clients; concurrent requests for the same key wait on the same fetch
+# ---------------------------
+class SharedCache:
+    """
+    Time-based cache of provider results with request coalescing.
+    Expired entries are removed when looked up, and the oldest entries are dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries=5000):
+        """
+        :param max_entries: maximum number of cached values
+        """
+        self.max_entries = max_entries
+        self.values = {} # key -> (expiry time, value), oldest first
+        self.pending = {} # key -> future of the fetch that is already running
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key, ttl, fetch):
+        """
+        Returns the cached value for key, or runs fetch() once no matter how many callers ask at the same time
+        :param key: hashable cache key, e.g. ("metadata", "AAPL")
+        :param ttl: seconds a fetched value stays valid
+        :param fetch: function returning a coroutine that fetches the value
+        :return: the value (None results are returned but not cached)
+        """
+        async def fetch_one(keys):
+            return {key: await fetch()}
+        values = await self.get_many([key], ttl, fetch_one)
+        return values[key]
+
+    async def get_many(self, keys, ttl, fetch_many):
+        """
+        Returns the values for several keys, fetching all the missing ones with a single fetch_many() call.
+        Keys that another caller is already fetching are waited for instead of being fetched again.
+        :param keys: list of hashable cache keys
+        :param ttl: seconds a fetched value stays valid
+        :param fetch_many: function taking the list of missing keys and returning a coroutine of {key: value}
+        :return: dictionary mapping each key to its value (None results are returned but not cached)
+        """
+        results = {}
+        waiting = {}
+        missing = []
+        now = time.monotonic()
+        for key in keys:
+            entry = self.values.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.hits += 1
+                    results[key] = entry[1]
+                    continue
+                del self.values[key] # expired
+            if key in self.pending: # someone is already fetching this, so wait for their result
+                self.hits += 1
+                waiting[key] = self.pending[key]
+            elif key not in missing:
+                self.misses += 1
+                missing.append(key)
+
+        if len(missing) > 0:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self.pending.update(futures)
+            try:
+                values = await fetch_many(missing)
+            except BaseException as e: # also covers cancellation, so waiting callers never hang
+                for future in futures.values():
+                    if isinstance(e, Exception):
+                        future.set_exception(e)
+                        future.exception() # marks the exception as retrieved when nobody else was waiting
+                    else:
+                        future.cancel()
+                raise
+            finally:
+                for key in missing:
+                    del self.pending[key]
+
+            for key in missing:
+                value = values.get(key)
+                if value is not None: # failures are retried on the next request
+                    self._store(key, ttl, value)
+                futures[key].set_result(value)
+                results[key] = value
+
+        for key in waiting:
+            results[key] = await asyncio.shield(waiting[key])
+        return results
+
+    def _store(self, key, ttl, value):
+        """
+        Caches a value, first removing expired entries and then the oldest ones if the cache is full
+        :return: None
+        """
+        if len(self.values) >= self.max_entries:
+            now = time.monotonic()
+            for k in [k for k, entry in self.values.items() if entry[0] <= now]:
+                del self.values[k]
+            while len(self.values) >= self.max_entries:
+                del self.values[next(iter(self.values))] # dicts keep insertion order, so this is the oldest
+        self.values[key] = (time.monotonic() + ttl, value)
+
+
+# ---------------------------
+# SERVICE
+# the same operations as the CLI menu, returning dicts instead of printing
+# ---------------------------
+QUOTE_TTL = 60 # seconds
+METADATA_TTL = 24 * 60 * 60
+HISTORY_TTL = 15 * 60
+
+# only the timeframes the CLI chart offers, so clients cannot fill the cache with arbitrary keys
+HISTORY_PERIODS = {period: interval for label, period, interval, title in main.TIMEFRAMES.values()} # default intervals
+HISTORY_INTERVALS = set(HISTORY_PERIODS.values())
+
+INFO_FIELDS = { # response key -> yahoo info key, as shown by view_stock_info_from_holdings()
+    "exchange": "exchange",
+    "currency": "currency",
+    "country": "country",
+    "sector": "sector",
+    "industry": "industry",
+    "market_cap": "marketCap",
+    "revenue": "totalRevenue",
+    "net_income": "netIncomeToCommon",
+    "pe": "trailingPE",
+    "pb": "priceToBook",
+    "roe": "returnOnEquity",
+    "gross_margin": "grossMargins",
+    "operating_margin": "operatingMargins",
+    "profit_margin": "profitMargins",
+}
+
+
+class ValuationService:
+    """
+    Read-only portfolio operations backed by one provider and one shared cache.
+    Splits and dividends already in the CLI's corporate actions cache are applied to a copy of the
+    portfolio on every request (nothing is saved; the CLI keeps downloading new events once a day).
+    """
+
+    def __init__(self, provider, load_portfolio=main.load_data, load_actions=main.load_actions_cache):
+        """
+        :param provider: YahooProvider or FakeProvider
+        :param load_portfolio: function returning the portfolio dict (re-read on every request)
+        :param load_actions: function returning the corporate actions cache (re-read on every request)
+        """
+        self.provider = provider
+        self.cache = SharedCache()
+        self.load_portfolio = load_portfolio
+        self.load_actions = load_actions
+
+    def _load_portfolio(self):
+        """
+        :return: copy of the saved portfolio with the cached splits/dividends applied
+        """
+        portfolio = copy.deepcopy(self.load_portfolio())
+        actions = self.load_actions()["actions"]
+        for t in portfolio:
+            if t in actions and "actions_through" in portfolio[t]:
+                main.apply_corporate_actions(portfolio[t], actions[t])
+        return portfolio
+
+    async def prices(self, tickers):
+        """
+        Returns cached prices, fetching all the missing ones with a single provider call
+        :param tickers: list of ticker symbols
+        :return: dictionary mapping each ticker to its price (or None)
+        """
+        async def fetch_quotes(keys):
+            prices = await self.provider.quotes([key[1] for key in keys])
+            return {key: prices.get(key[1]) for key in keys}
+
+        values = await self.cache.get_many([("quote", t) for t in tickers], QUOTE_TTL, fetch_quotes)
+        return {t: values[("quote", t)] for t in tickers}
+
+    async def _priced_portfolio(self):
+        """
+        Loads the portfolio and fetches prices, leaving out holdings without a price
+        :return: (portfolio with prices, prices, list of tickers without a price)
+        """
+        portfolio = self._load_portfolio()
+        prices = await self.prices(list(portfolio.keys()))
+        missing = [t for t in prices if prices[t] is None]
+        priced = {t: portfolio[t] for t in portfolio if prices[t] is not None}
+        return priced, prices, missing
+
+    async def holdings(self):
+        return {"holdings": self._load_portfolio()}
+
+    async def summary(self):
+        portfolio, prices, missing = await self._priced_portfolio()
+        totals = main.portfolio_totals(portfolio, prices)
+        positions = list(main.position_rows(portfolio, prices, totals["value"]))
+        return {"totals": totals, "positions": positions, "missing_prices": missing}
+
+    async def rebalance(self, weights):
+        """
+        :param weights: dictionary of ticker -> target weight in % (tickers left out get 0)
+        :return: dict with total value, normalized targets and trades
+        """
+        portfolio, prices, missing = await self._priced_portfolio()
+
+        total_w = sum(weights.get(t, 0.0) for t in portfolio)
+        if total_w == 0:
+            raise ValueError("All weights are 0. Nothing to do.")
+        targets = {t: (weights.get(t, 0.0) / total_w) * 100 for t in portfolio} # normalize to sum to 100
+
+        totals = main.portfolio_totals(portfolio, prices)
+        trades = list(main.rebalance_trades(portfolio, prices, targets, totals["value"]))
+        return {"total_value": totals["value"], "trades": trades, "missing_prices": missing}
+
+    async def info(self, ticker):
+        info, prices = await asyncio.gather(
+            self.cache.get(("metadata", ticker), METADATA_TTL, lambda: self.provider.metadata(ticker)),
+            self.prices([ticker]),
+        )
+        price = prices[ticker]
+        if info is None or price is None:
+            return None
+
+        result = {"ticker": ticker, "name": info.get("longName") or info.get("shortName") or "N/A", "price": price}
+        for key, yahoo_key in INFO_FIELDS.items():
+            result[key] = info.get(yahoo_key)
+        return result
+
+    async def history(self, ticker, period, interval):
+        closes = await self.cache.get(("history", ticker, period, interval), HISTORY_TTL,
+                                      lambda: self.provider.history(ticker, period, interval))
+        if closes is None:
+            return None
+        return {"ticker": ticker, "period": period, "interval": interval, "closes": closes}
+
+    def stats(self):
+        return {"provider_calls": self.provider.calls, "cache_hits": self.cache.hits, "cache_misses": self.cache.misses}
+
+
+# ---------------------------
+# HTTP
+# minimal HTTP/1.1 on asyncio streams (GET only, keep-alive), so no web framework is needed
+# ---------------------------
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    502: "Bad Gateway", # only used when the data provider could not return data
+}
+
+
+async def route(service, method, target):
+    """
+    Maps one request to a service call
+    :param service: ValuationService
+    :param method: HTTP method
+    :param target: request path with query string, e.g. "/history/AAPL?period=1y"
+    :return: (status code, JSON-serializable body)
+    """
+    if method != "GET":
+        return 405, {"error": "Only GET is supported."}
+
+    url = urlsplit(target)
+    parts = [unquote(p) for p in url.path.strip("/").split("/") if p != ""]
+    query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    if parts == ["holdings"]:
+        return 200, await service.holdings()
+    if parts == ["summary"]:
+        return 200, await service.summary()
+    if parts == ["stats"]:
+        return 200, service.stats()
+    if parts == ["rebalance"]: # e.g. /rebalance?AAPL=50&NVDA=50
+        try:
+            weights = {t.upper(): float(w) for t, w in query.items()}
+        except ValueError:
+            return 400, {"error": "Weights must be numbers."}
+        if any(not math.isfinite(w) for w in weights.values()): # float() also accepts "nan", "inf" and "1e309"
+            return 400, {"error": "Weights must be finite numbers."}
+        if any(w < 0 for w in weights.values()):
+            return 400, {"error": "Weights must be >= 0."}
+        try:
+            return 200, await service.rebalance(weights)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+    if len(parts) == 2 and parts[0] == "info":
+        body = await service.info(parts[1].upper())
+        if body is None:
+            return 502, {"error": "Could not fetch company info right now."}
+        return 200, body
+    if len(parts) == 2 and parts[0] == "history": # e.g. /history/AAPL?period=1y&interval=1wk
+        period = query.get("period", "1mo")
+        if period not in HISTORY_PERIODS:
+            return 400, {"error": "period must be one of: " + ", ".join(HISTORY_PERIODS)}
+        interval = query.get("interval", HISTORY_PERIODS[period])
+        if interval not in HISTORY_INTERVALS:
+            return 400, {"error": "interval must be one of: " + ", ".join(sorted(HISTORY_INTERVALS))}
+        body = await service.history(parts[1].upper(), period, interval)
+        if body is None:
+            return 502, {"error": "No price data found for this timeframe."}
+        return 200, body
+
+    return 404, {"error": "Unknown endpoint."}
+
+
+async def read_request(reader):
+    """
+    Reads one request (request line, headers and body) from the connection
+    :param reader: asyncio stream reader
+    :return: (method, target, version, headers), or None if the client closed the connection
+    :raises ValueError: if the request cannot be parsed
+    """
+    request_line = await reader.readline() # raises ValueError if the line is too long
+    if not request_line:
+        return None
+
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ValueError("Malformed request line.")
+    method, target, version = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, colon, value = line.decode("latin-1").partition(":")
+        if colon == "" or name.strip() == "":
+            raise ValueError("Malformed header.")
+        headers[name.strip().lower()] = value.strip()
+
+    length = headers.get("content-length", "0")
+    if not length.isdigit():
+        raise ValueError("Invalid Content-Length.")
+    if int(length) > 0:
+        await reader.readexactly(int(length)) # body is not used, but must be read
+
+    return method, target, version, headers
+
+
+async def send_response(writer, status, body, keep_alive):
+    """
+    Writes one JSON response
+    :param writer: asyncio stream writer
+    :param status: HTTP status code
+    :param body: JSON-serializable body
+    :param keep_alive: whether the connection stays open afterwards
+    :return: None
+    """
+    payload = json.dumps(body, allow_nan=False).encode() # NaN/Infinity are not valid JSON
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+
+
+async def handle_client(service, reader, writer):
+    """
+    Serves requests from one connection until the client closes it
+    :return: None
+    """
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except ValueError as e: # after a bad request the stream position is unknown, so the connection is closed
+                await send_response(writer, 400, {"error": str(e) or "Bad request."}, keep_alive=False)
+                break
+            if request is None:
+                break # client closed the connection
+            method, target, version, headers = request
+
+            try:
+                status, body = await route(service, method, target)
+            except Exception:
+                traceback.print_exc() # a bug, not a provider failure (those are returned as 502 by route)
+                status, body = 500, {"error": "Internal server error."}
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            try:
+                await send_response(writer, status, body, keep_alive)
+            except ValueError: # a NaN/Infinity in the body, which is a bug as well
+                traceback.print_exc()
+                await send_response(writer, 500, {"error": "Internal server error."}, keep_alive)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host="127.0.0.1", port=8000):
+    """
+    Starts listening for requests (port 0 picks a free port)
+    :param service: ValuationService shared by all connections
+    :return: asyncio server
+    """
+    return await asyncio.start_server(lambda r, w: handle_client(service, r, w), host, port)
+
+
+def run(port=8000):
+    """
+    Runs the valuation service on localhost with the Yahoo provider until Ctrl+C
+    :param port: TCP port to listen on
+    :return: None
+    """
+    async def serve():
+        service = ValuationService(YahooProvider())
+        server = await start_server(service, port=port)
+        print(f"Serving on http://127.0.0.1:{port} (holdings, summary, rebalance, info/<ticker>, history/<ticker>)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and not sys.argv[1].isdigit()):
+        print("Usage: python server.py [port]")
+        sys.exit(2)
+    port = int(sys.argv[1]) if len(sys.argv) == 2 else 8000
+    if not 0 < port < 65536:
+        print("Port must be between 1 and 65535.")
+        sys.exit(2)
+    run(port)
@@ -0,0 +1,159 @@
+#Checks the split/dividend rules, since they change the saved shares, avg_cost and dividends
+#Run with: python -m unittest (or pytest)
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import main
+
+
+class ApplyCorporateActionsTest(unittest.TestCase):
+
+    def test_splits_and_dividends(self):
+        holding = {"shares": 10.0, "avg_cost": 100.0, "actions_through": "2024-01-01"}
+        actions = {
+            "splits": [["2024-06-01", 2.0]],
+            "dividends": [["2024-03-01", 1.0], ["2024-06-01", 0.5], ["2024-09-01", 0.6]],
+        }
+
+        applied = main.apply_corporate_actions(holding, actions)
+
+        self.assertEqual(applied, 4)
+        self.assertEqual(holding["shares"], 20.0)
+        self.assertEqual(holding["avg_cost"], 50.0)
+        # 10 * 1.0 + 10 * 0.5 (same day as the split, paid on pre-split shares) + 20 * 0.6
+        self.assertAlmostEqual(holding["dividends"], 27.0)
+        self.assertEqual(holding["actions_through"], "2024-09-01")
+
+    def test_only_events_after_actions_through(self):
+        holding = {"shares": 10.0, "avg_cost": 100.0, "actions_through": "2024-06-01", "dividends": 5.0}
+        actions = {
+            "splits": [["2024-06-01", 2.0]],
+            "dividends": [["2024-03-01", 1.0], ["2024-06-01", 0.5], ["2024-09-01", 0.6]],
+        }
+
+        applied = main.apply_corporate_actions(holding, actions)
+
+        self.assertEqual(applied, 1)
+        self.assertEqual(holding["shares"], 10.0)
+        self.assertEqual(holding["avg_cost"], 100.0)
+        self.assertAlmostEqual(holding["dividends"], 11.0)
+
+    def test_applying_twice_changes_nothing(self):
+        holding = {"shares": 10.0, "avg_cost": 100.0, "actions_through": "2024-01-01"}
+        actions = {"splits": [["2024-06-01", 4.0]], "dividends": [["2024-09-01", 0.25]]}
+
+        main.apply_corporate_actions(holding, actions)
+        before = dict(holding)
+        applied = main.apply_corporate_actions(holding, actions)
+
+        self.assertEqual(applied, 0)
+        self.assertEqual(holding, before)
+
+
+class MakeHoldingTest(unittest.TestCase):
+    # NVDA-like history: a 10-for-1 split in June 2024
+    ACTIONS = {"splits": [["2024-06-10", 10.0]], "dividends": [["2024-03-05", 0.04], ["2024-09-12", 0.01]]}
+
+    def test_current_broker_figures_are_not_split_again(self):
+        # bought in 2023, but entered with today's (already split) figures as of today
+        holding = main.make_holding(100.0, 45.0, "USD", date.today().isoformat())
+
+        applied = main.apply_corporate_actions(holding, self.ACTIONS)
+
+        self.assertEqual(applied, 0)
+        self.assertEqual(holding["shares"], 100.0)
+        self.assertEqual(holding["avg_cost"], 45.0)
+
+    def test_figures_as_of_purchase_date_get_later_splits(self):
+        holding = main.make_holding(10.0, 450.0, "USD", "2023-06-01")
+
+        main.apply_corporate_actions(holding, self.ACTIONS)
+
+        self.assertEqual(holding["shares"], 100.0)
+        self.assertEqual(holding["avg_cost"], 45.0)
+        self.assertAlmostEqual(holding["dividends"], 10 * 0.04 + 100 * 0.01)
+
+    def test_update_keeps_dividends_and_rejects_already_processed_dates(self):
+        old = {"shares": 100.0, "avg_cost": 45.0, "actions_through": "2024-09-12", "dividends": 1.4}
+
+        holding = main.make_holding(150.0, 60.0, "USD", "2024-10-01", old)
+        self.assertEqual(holding["dividends"], 1.4)
+        self.assertEqual(holding["actions_through"], "2024-10-01")
+
+        with self.assertRaises(ValueError):
+            main.make_holding(150.0, 60.0, "USD", "2024-01-01", old)
+
+    def test_invalid_input(self):
+        for args in [(0.0, 1.0, "USD", "2024-01-01"), (1.0, 1.0, "USD", "01/02/2024"), (1.0, 1.0, "USD", "2999-01-01")]:
+            with self.assertRaises(ValueError):
+                main.make_holding(*args)
+
+
+class UpdateCorporateActionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(main, "ACTIONS_FILE", os.path.join(self.tmp.name, "actions.json")),
+            mock.patch.object(main, "DATA_FILE", os.path.join(self.tmp.name, "portfolio.json")),
+            mock.patch.object(main, "fetch_corporate_actions", side_effect=self.fake_fetch),
+        ]
+        for p in self.patches:
+            p.start()
+        self.starts = []
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def fake_fetch(self, tickers, start):
+        self.starts.append(start)
+        dividends = [d for d in [["2023-03-01", 1.0], ["2026-01-05", 1.0]] if d[0] >= start]
+        return {t: {"splits": [], "dividends": [list(d) for d in dividends]} for t in tickers}
+
+    def test_readded_ticker_with_earlier_date_is_fetched_again(self):
+        recent = (date.today() - timedelta(days=30)).isoformat()
+        portfolio = {"AAPL": {"shares": 10.0, "avg_cost": 1.0, "actions_through": recent, "dividends": 0.0}}
+        main.update_corporate_actions(portfolio)
+        main.update_corporate_actions(portfolio) # same day, served from the cache
+        self.assertEqual(len(self.starts), 1)
+
+        # removed and re-added with an earlier date, before the cache is cleaned up
+        portfolio = {"AAPL": {"shares": 10.0, "avg_cost": 1.0, "actions_through": "2023-01-01", "dividends": 0.0}}
+        main.update_corporate_actions(portfolio)
+
+        self.assertEqual(len(self.starts), 2)
+        self.assertLessEqual(self.starts[-1], "2023-01-01")
+        self.assertAlmostEqual(portfolio["AAPL"]["dividends"], 20.0)
+
+
+class UnadjustDividendsTest(unittest.TestCase):
+
+    def test_only_later_splits_are_undone(self):
+        splits = [["2024-02-01", 2.0], ["2024-06-01", 3.0]]
+        dividends = [["2024-01-01", 0.1], ["2024-03-01", 0.1], ["2024-06-01", 0.1], ["2024-07-01", 0.1]]
+
+        main.unadjust_dividends(splits, dividends)
+
+        amounts = [round(d[1], 6) for d in dividends]
+        self.assertEqual(amounts, [0.6, 0.3, 0.1, 0.1])
+
+
+class MergeCorporateActionsTest(unittest.TestCase):
+
+    def test_new_download_replaces_overlap(self):
+        old = {"splits": [["2024-01-10", 2.0]], "dividends": [["2024-01-05", 1.0], ["2024-02-05", 1.0]]}
+        new = {"splits": [], "dividends": [["2024-02-05", 1.0], ["2024-03-05", 1.2]]}
+
+        merged = main.merge_corporate_actions(old, new, "2024-02-01")
+
+        self.assertEqual(merged["splits"], [["2024-01-10", 2.0]])
+        self.assertEqual(merged["dividends"], [["2024-01-05", 1.0], ["2024-02-05", 1.0], ["2024-03-05", 1.2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
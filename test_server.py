@@ -0,0 +1,173 @@
+#Checks the shared cache (coalescing, failures, expiry, eviction) and the HTTP handling of the valuation service
+#Run with: python -m unittest (or pytest)
+import asyncio
+import unittest
+
+import server
+
+
+PORTFOLIO = {
+    "AAPL": {"shares": 10.0, "avg_cost": 100.0, "currency": "USD", "actions_through": "2024-01-01", "dividends": 0.0},
+    "NVDA": {"shares": 10.0, "avg_cost": 450.0, "currency": "USD", "actions_through": "2024-01-01", "dividends": 0.0},
+}
+ACTIONS = {"actions": {"NVDA": {"splits": [["2024-06-10", 10.0]], "dividends": []}}}
+
+
+def make_service():
+    return server.ValuationService(server.FakeProvider(latency=0), load_portfolio=lambda: PORTFOLIO,
+                                   load_actions=lambda: ACTIONS)
+
+
+class SharedCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_requests_share_one_fetch(self):
+        cache = server.SharedCache()
+        calls = []
+
+        async def fetch_many(keys):
+            calls.append(list(keys))
+            await asyncio.sleep(0.01)
+            return {key: key[1] * 2 for key in keys}
+
+        results = await asyncio.gather(
+            cache.get_many([("q", 1), ("q", 2)], 60, fetch_many),
+            cache.get_many([("q", 2), ("q", 1)], 60, fetch_many),
+            cache.get_many([("q", 1)], 60, fetch_many),
+        )
+
+        self.assertEqual(calls, [[("q", 1), ("q", 2)]])
+        self.assertEqual(results[1], {("q", 2): 4, ("q", 1): 2})
+        self.assertEqual(await cache.get_many([("q", 2)], 60, fetch_many), {("q", 2): 4}) # cached now
+        self.assertEqual(len(calls), 1)
+
+    async def test_failed_fetch_reaches_waiters_and_is_not_cached(self):
+        cache = server.SharedCache()
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.wait_for(
+            asyncio.gather(cache.get("k", 60, failing), cache.get("k", 60, failing), return_exceptions=True),
+            timeout=1, # waiting callers must not hang
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertNotIn("k", cache.values)
+        self.assertEqual(cache.pending, {})
+
+        async def working():
+            return "ok"
+        self.assertEqual(await cache.get("k", 60, working), "ok")
+
+    async def test_none_is_not_cached(self):
+        cache = server.SharedCache()
+
+        async def nothing():
+            return None
+        self.assertIsNone(await cache.get("k", 60, nothing))
+        self.assertNotIn("k", cache.values)
+
+    async def test_expired_entries_are_removed(self):
+        cache = server.SharedCache()
+
+        async def value():
+            return 1
+        await cache.get("k", 0.01, value)
+        await asyncio.sleep(0.02)
+        await cache.get("k", 0.01, lambda: asyncio.sleep(0)) # fetches None, so nothing is stored again
+
+        self.assertNotIn("k", cache.values)
+
+    async def test_eviction_at_max_entries(self):
+        cache = server.SharedCache(max_entries=3)
+
+        async def value():
+            return 1
+        for i in range(5):
+            await cache.get(i, 60, value)
+
+        self.assertEqual(list(cache.values.keys()), [2, 3, 4]) # the oldest were dropped
+
+
+class ReadRequestTest(unittest.IsolatedAsyncioTestCase):
+
+    async def read(self, raw):
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await server.read_request(reader)
+
+    async def test_valid_request_with_body(self):
+        request = await self.read(b"GET /summary HTTP/1.1\r\nHost: x\r\nContent-Length: 3\r\n\r\nabcGET")
+        self.assertEqual(request, ("GET", "/summary", "HTTP/1.1", {"host": "x", "content-length": "3"}))
+
+    async def test_closed_connection(self):
+        self.assertIsNone(await self.read(b""))
+
+    async def test_malformed_requests(self):
+        for raw in [b"garbage\r\n\r\n",
+                    b"GET /summary FTP/1.0\r\n\r\n",
+                    b"GET /summary HTTP/1.1\r\nno colon here\r\n\r\n",
+                    b"GET /summary HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+                    b"GET /summary HTTP/1.1\r\nContent-Length: -5\r\n\r\n"]:
+            with self.assertRaises(ValueError, msg=raw):
+                await self.read(raw)
+
+
+class HttpTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = await server.start_server(make_service(), port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def send(self, raw):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=2)
+        writer.close()
+        return response
+
+    async def test_bad_request_line_gets_400(self):
+        response = await self.send(b"garbage\r\n\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.1 400 "))
+
+    async def test_bad_content_length_gets_400(self):
+        response = await self.send(b"GET /holdings HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.1 400 "))
+
+    async def test_valid_request(self):
+        response = await self.send(b"GET /holdings HTTP/1.1\r\nConnection: close\r\n\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.1 200 "))
+
+
+class RouteTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_invalid_parameters(self):
+        service = make_service()
+        for target in ["/rebalance?AAPL=nan", "/rebalance?AAPL=inf", "/rebalance?AAPL=-1", "/rebalance?AAPL=x",
+                       "/rebalance?AAPL=0", "/history/AAPL?period=7y", "/history/AAPL?period=1y&interval=1m"]:
+            status, body = await server.route(service, "GET", target)
+            self.assertEqual(status, 400, target)
+        self.assertEqual((await server.route(service, "GET", "/nope"))[0], 404)
+        self.assertEqual((await server.route(service, "POST", "/summary"))[0], 405)
+
+    async def test_summary_applies_cached_splits_without_saving(self):
+        status, body = await server.route(make_service(), "GET", "/summary")
+
+        nvda = [p for p in body["positions"] if p["ticker"] == "NVDA"][0]
+        self.assertEqual(status, 200)
+        self.assertEqual((nvda["shares"], nvda["avg_cost"]), (100.0, 45.0))
+        self.assertEqual(PORTFOLIO["NVDA"]["shares"], 10.0) # saved data is untouched
+
+
+if __name__ == "__main__":
+    unittest.main()